@@ -1,6 +1,11 @@
 import requests
-import json
+import argparse
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from net import (JSON_HEADERS, CONNECT_TIMEOUT, READ_TIMEOUT, precompute_urls, session_for, close_sessions,
+                 request_with_backoff, encode_json, parse_json, prewarm, prewarm_sessions, MultiStatusPoller)
 
 # Example config: list of Pi hostnames or IPs
 PI_CONFIG = [
@@ -8,10 +13,15 @@ PI_CONFIG = [
     {'name': 'Pi2', 'host': 'http://192.168.1.102:5000'},
 ]
 
+# Menu labels and endpoint URLs are fixed for the session, so build them once
+PI_LABELS = tuple(f'{pi["name"]} ({pi["host"]})' for pi in PI_CONFIG)
+for pi in PI_CONFIG:
+    precompute_urls(pi)
+
 def list_pis():
     print('Available Raspberry Pis:')
-    for idx, pi in enumerate(PI_CONFIG):
-        print(f'{idx+1}. {pi["name"]} ({pi["host"]})')
+    for idx, label in enumerate(PI_LABELS):
+        print(f'{idx+1}. {label}')
 
 def select_pi():
     list_pis()
@@ -26,14 +36,18 @@ def select_pi():
         except ValueError:
             print('[ERROR] Please enter a valid number.')
 
-def start_recording(pi, duration, fps):
-    url = f'{pi["host"]}/start_recording'
-    payload = {'duration': duration, 'fps': fps}
-    print(f"[DEBUG] Sending start_recording to {url} with payload {payload}")
+def start_recording(pi, duration, fps, body=None):
+    url = pi['_start_url']
+    if body is None:
+        body = encode_json({'duration': duration, 'fps': fps})
+    print(f"[DEBUG] Sending start_recording to {url} with payload {body.decode()}")
     try:
-        resp = requests.post(url, json=payload, timeout=5)
+        resp = request_with_backoff(session_for(pi), 'POST', url, data=body, headers=JSON_HEADERS,
+                                     timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         resp.raise_for_status()
-        print('[INFO] Response:', resp.json())
+        result = parse_json(resp)
+        print('[INFO] Response:', result)
+        return result
     except requests.exceptions.ConnectionError:
         print(f'[ERROR] Could not connect to {url}. Is the Pi online?')
     except requests.exceptions.Timeout:
@@ -42,14 +56,17 @@ def start_recording(pi, duration, fps):
         print(f'[ERROR] HTTP error: {e} - {resp.text}')
     except Exception as e:
         print(f'[ERROR] Unexpected error: {e}')
+    return None
 
 def stop_recording(pi):
-    url = f'{pi["host"]}/stop_recording'
+    url = pi['_stop_url']
     print(f"[DEBUG] Sending stop_recording to {url}")
     try:
-        resp = requests.post(url, timeout=5)
+        resp = request_with_backoff(session_for(pi), 'POST', url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         resp.raise_for_status()
-        print('[INFO] Response:', resp.json())
+        result = parse_json(resp)
+        print('[INFO] Response:', result)
+        return result
     except requests.exceptions.ConnectionError:
         print(f'[ERROR] Could not connect to {url}. Is the Pi online?')
     except requests.exceptions.Timeout:
@@ -58,14 +75,15 @@ def stop_recording(pi):
         print(f'[ERROR] HTTP error: {e} - {resp.text}')
     except Exception as e:
         print(f'[ERROR] Unexpected error: {e}')
+    return None
 
 def check_status(pi):
-    url = f'{pi["host"]}/status'
+    url = pi['_status_url']
     print(f"[DEBUG] Checking status at {url}")
     try:
-        resp = requests.get(url, timeout=5)
+        resp = request_with_backoff(session_for(pi), 'GET', url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         resp.raise_for_status()
-        status = resp.json()
+        status = parse_json(resp)
         print(f"[INFO] Status: {status}")
         return status
     except requests.exceptions.ConnectionError:
@@ -78,28 +96,141 @@ def check_status(pi):
         print(f'[ERROR] Unexpected error: {e}')
     return None
 
-def main():
-    print('[DEBUG] Starting PC controller')
-    pi = select_pi()
-    while True:
-        action = input('Enter action (start/stop/status/exit): ').strip().lower()
-        if action == 'start':
-            try:
-                duration = int(input('Enter duration (seconds): '))
-                fps = int(input('Enter fps: '))
-                print(f"[DEBUG] User input - duration: {duration}, fps: {fps}")
-                start_recording(pi, duration, fps)
-            except ValueError:
-                print('[ERROR] Please enter valid numbers for duration and fps.')
-        elif action == 'stop':
-            stop_recording(pi)
-        elif action == 'status':
-            check_status(pi)
-        elif action == 'exit':
-            print('[DEBUG] Exiting controller.')
-            break
+def check_status_all(poller):
+    print(f"[DEBUG] Checking status on {len(poller.pis)} Pi(s)")
+    results = poller.poll()
+    for pi in poller.pis:
+        status = results[pi['host']]
+        if status is None:
+            print(f"[ERROR] {pi['name']}: no status (offline or timed out)")
         else:
-            print('[ERROR] Unknown action. Please enter start, stop, status, or exit.')
+            print(f"[INFO] {pi['name']}: {status}")
+    return results
+
+def start_all(pis, duration, fps):
+    """Send start_recording to every Pi concurrently so they all start within one round-trip"""
+    print(f"[DEBUG] Starting recording on {len(pis)} Pi(s)")
+    body = encode_json({'duration': duration, 'fps': fps})
+    # Connect to every Pi first, then release all POSTs together to minimise start skew
+    barrier = threading.Barrier(len(pis))
+    
+    def start_one(pi):
+        try:
+            prewarm(pi)
+        except Exception as e:
+            # Release the other workers instead of leaving them waiting for this Pi
+            barrier.abort()
+            print(f"[ERROR] Could not prepare {pi['name']}: {e}")
+            return None
+        try:
+            # A Pi whose prewarm stalls can't hold the others for more than one request's worth of time
+            barrier.wait(timeout=CONNECT_TIMEOUT + READ_TIMEOUT)
+        except threading.BrokenBarrierError:
+            # Another Pi failed or stalled; start this one without waiting any longer
+            pass
+        return start_recording(pi, duration, fps, body)
+    
+    with ThreadPoolExecutor(max_workers=len(pis)) as pool:
+        return list(pool.map(start_one, pis))
+
+def stop_all(pis):
+    """Send stop_recording to every Pi concurrently"""
+    print(f"[DEBUG] Stopping recording on {len(pis)} Pi(s)")
+    with ThreadPoolExecutor(max_workers=len(pis)) as pool:
+        return list(pool.map(stop_recording, pis))
+
+def find_pi(name):
+    for pi in PI_CONFIG:
+        if pi['name'] == name:
+            return pi
+    return None
+
+def repl():
+    threading.Thread(target=prewarm_sessions, args=(PI_CONFIG,), daemon=True).start()
+    pi = select_pi()
+    poller = MultiStatusPoller(PI_CONFIG)
+    try:
+        while True:
+            action = input('Enter action (start/startall/stop/status/statusall/exit): ').strip().lower()
+            if action in ('start', 'startall'):
+                try:
+                    duration = int(input('Enter duration (seconds): '))
+                    fps = int(input('Enter fps: '))
+                    print(f"[DEBUG] User input - duration: {duration}, fps: {fps}")
+                    if action == 'startall':
+                        start_all(PI_CONFIG, duration, fps)
+                    else:
+                        start_recording(pi, duration, fps)
+                except ValueError:
+                    print('[ERROR] Please enter valid numbers for duration and fps.')
+            elif action == 'stop':
+                stop_recording(pi)
+            elif action == 'status':
+                check_status(pi)
+            elif action == 'statusall':
+                check_status_all(poller)
+            elif action == 'exit':
+                print('[DEBUG] Exiting controller.')
+                break
+            else:
+                print('[ERROR] Unknown action. Please enter start, startall, stop, status, statusall, or exit.')
+    finally:
+        poller.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Control dual camera recording on Raspberry Pis. '
+                                                 'Run without a command for the interactive prompt.')
+    subparsers = parser.add_subparsers(dest='cmd')
+    
+    start_parser = subparsers.add_parser('start', help='Start recording')
+    start_parser.add_argument('--duration', type=int, default=60, help='Duration in seconds')
+    start_parser.add_argument('--fps', type=int, default=100, help='Target FPS')
+    stop_parser = subparsers.add_parser('stop', help='Stop recording')
+    status_parser = subparsers.add_parser('status', help='Check recording status')
+    
+    for sub in (start_parser, stop_parser, status_parser):
+        target = sub.add_mutually_exclusive_group(required=True)
+        target.add_argument('--pi', help='Name of the Pi to control')
+        target.add_argument('--all', action='store_true', help='Send the command to every Pi')
+    
+    args = parser.parse_args(argv)
+    if args.cmd is not None and not args.all:
+        args.target = find_pi(args.pi)
+        if args.target is None:
+            parser.error(f"unknown Pi '{args.pi}' (choose from: {', '.join(pi['name'] for pi in PI_CONFIG)})")
+    return args
+
+def main(argv=None):
+    """Run the CLI; returns 0 if every targeted Pi succeeded, 1 otherwise"""
+    args = parse_args(argv)
+    print('[DEBUG] Starting PC controller')
+    results = []
+    try:
+        if args.cmd is None:
+            repl()
+        elif args.cmd == 'start':
+            if args.all:
+                results = start_all(PI_CONFIG, args.duration, args.fps)
+            else:
+                results = [start_recording(args.target, args.duration, args.fps)]
+        elif args.cmd == 'stop':
+            if args.all:
+                results = stop_all(PI_CONFIG)
+            else:
+                results = [stop_recording(args.target)]
+        elif args.cmd == 'status':
+            if args.all:
+                poller = MultiStatusPoller(PI_CONFIG)
+                try:
+                    results = list(check_status_all(poller).values())
+                finally:
+                    poller.close()
+            else:
+                results = [check_status(args.target)]
+    finally:
+        close_sessions()
+    # Each command returns None for a Pi that failed, so scripts can check the exit status
+    return 1 if any(result is None for result in results) else 0
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    sys.exit(main())
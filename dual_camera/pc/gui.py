@@ -1,28 +1,64 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from PIL import Image, ImageTk
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import copy
 import os
-import io
+import stat
+import shutil
+import tempfile
 import socket
+import selectors
+import struct
+import errno
 import threading
+import queue
+import time
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import subprocess
 import platform
+from collections import deque
+from urllib.parse import urlsplit
+
+from net import (JSON_HEADERS, CONNECT_TIMEOUT, READ_TIMEOUT, precompute_urls, session_for, close_sessions,
+                 request_with_backoff, encode_json, loads_json, parse_json, prewarm, prewarm_sessions,
+                 MultiStatusPoller)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from zeroconf import Zeroconf, ServiceBrowser, ServiceStateChange
+except ImportError:
+    Zeroconf = None
 
 CONFIG_FILE = 'pi_config.json'
+# Kept apart from CONFIG_FILE so the Pi list format stays unchanged
+SCAN_CACHE_FILE = 'scan_cache.json'
+# Addresses that answered a scan within this many seconds are probed first
+SCAN_CACHE_TTL = 3600
 
 # Load or initialize Pi config
 if os.path.exists(CONFIG_FILE):
     try:
-        with open(CONFIG_FILE, 'r') as f:
+        # Binary read so a UTF-8 file written by orjson decodes the same on every platform
+        with open(CONFIG_FILE, 'rb') as f:
             PI_CONFIG = json.load(f)
     except (json.JSONDecodeError, ValueError) as e:
         print(f"Warning: Corrupted config file detected: {e}")
         # Create backup of corrupted file
         backup_file = f"{CONFIG_FILE}.backup"
         try:
-            import shutil
             shutil.copy2(CONFIG_FILE, backup_file)
             print(f"Backup created: {backup_file}")
         except Exception as backup_error:
@@ -31,121 +67,476 @@ if os.path.exists(CONFIG_FILE):
 else:
     PI_CONFIG = []
 
+# IPv4 line of an "Ethernet adapter" block in ipconfig output, on the direct-link subnet
+_ETH_IPV4_RE = re.compile(r'Ethernet adapter[^\n]*\n(?:[^\n]*\n){0,10}?[^\n]*IPv4[^:\n]*:\s*(192\.168\.2\.\d+)')
+# Any IPv4 line in ipconfig output on the direct-link subnet, whatever the adapter is called
+_ANY_IPV4_RE = re.compile(r'IPv4[^:\n]*:\s*(192\.168\.2\.\d+)')
+# Source address of an "ip route" entry on the direct-link subnet
+_ROUTE_SRC_RE = re.compile(r'^192\.168\.2\.[^\n]*\bsrc\s+(\d+\.\d+\.\d+\.\d+)', re.M)
+
+def _url_host(ip):
+    """Format an address for a URL authority, bracketing IPv6 literals"""
+    if ':' in ip:
+        return f"[{ip.replace('%', '%25')}]"
+    return ip
+
+# Discovery talks to whatever answers on the port, so replies are size-capped and never followed
+MAX_DISCOVERY_BYTES = 64 * 1024
+
+def _get_small_json(session, url, timeout, limit=MAX_DISCOVERY_BYTES):
+    """GET a small JSON document; None for redirects, non-JSON replies or bodies over limit"""
+    with session.get(url, timeout=timeout, stream=True, allow_redirects=False) as resp:
+        if resp.status_code != 200 or 'json' not in resp.headers.get('Content-Type', ''):
+            return None
+        if int(resp.headers.get('Content-Length') or 0) > limit:
+            return None
+        resp.raw.decode_content = True
+        body = resp.raw.read(limit + 1)
+        if len(body) > limit:
+            return None
+        return loads_json(body)
+
+def _dump_config(pis):
+    """Serialize the Pi list as indented JSON bytes, using orjson when it is available"""
+    if orjson is not None:
+        return orjson.dumps(pis, option=orjson.OPT_INDENT_2)
+    return json.dumps(pis, indent=2).encode()
+
+# Read once at import: os.umask can only be queried by setting it, which would race with worker threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _write_config_atomic(data, path=CONFIG_FILE):
+    """Write to a temp file and rename it over path so a crash never leaves a truncated config"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the existing file's mode, or the umask default for a new one
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _write_config_files(pis, scan_cache):
+    """Write the Pi list and the scan cache; returns the config file's new cache key"""
+    _write_config_atomic(_dump_config(pis))
+    key = _config_key()
+    _write_config_atomic(_dump_config(scan_cache), SCAN_CACHE_FILE)
+    return key
+
+def _read_config(path=CONFIG_FILE):
+    """Load the Pi list from path, using orjson when it is available"""
+    with open(path, 'rb') as f:
+        return loads_json(f.read())
+
+def _config_key(path=CONFIG_FILE):
+    """Identify a version of the config file by modification time and size"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _load_scan_cache(path=SCAN_CACHE_FILE):
+    """Return the {address: last_seen} map from earlier scans, or {} if there is none"""
+    try:
+        cache = _read_config(path)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _gather(futures, timeout):
+    """Results of the futures that finish within timeout, in submission order; stragglers are dropped"""
+    done = set()
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            done.add(future)
+    except FuturesTimeoutError:
+        pass
+    return [future.result() for future in futures if future in done]
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after ttl seconds"""
+    def __init__(self, ttl, maxsize=64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Drop the oldest entry
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (value, time.monotonic() + self.ttl)
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
 class NetworkScanner:
-    def __init__(self):
+    def __init__(self, session=None, connect_timeout=0.3, username_timeout=2.0):
+        # Shared session so repeated probes of the same address reuse a kept-alive connection
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+        self.session = session
+        # Direct-ethernet RTT is sub-millisecond, so a short connect timeout skips dead hosts quickly
+        self.connect_timeout = connect_timeout
+        # /username goes through the Pi's Flask stack, which can be slow while it is recording
+        self.username_timeout = username_timeout
         self.found_pis = []
+        # Repeated scans within a few seconds reuse the last /username answer per address
+        self._username_cache = TTLCache(ttl=5)
+        # Resolver lookups for .local names can take seconds, so answers are kept for a while
+        self._dns_cache = TTLCache(ttl=300)
+        self._progress_lock = threading.Lock()
     
     def get_ethernet_interface(self):
-        """Get the ethernet interface IP address"""
+        """Get the direct-link interface IP address, or None if there is none; raises if it can't be determined"""
+        if psutil is not None:
+            # Reads the OS interface table directly instead of spawning and parsing a command
+            for addrs in psutil.net_if_addrs().values():
+                for addr in addrs:
+                    if addr.family == socket.AF_INET and addr.address.startswith('192.168.2.'):
+                        return addr.address
+            return None
+        
+        # A missing tool or failed command raises, so callers can tell "unknown" from "no interface"
+        if platform.system() == "Windows":
+            # Prefer an 'Ethernet adapter' block, but accept any adapter on the direct-link subnet
+            result = subprocess.run(['ipconfig'], capture_output=True, text=True, check=True)
+            match = _ETH_IPV4_RE.search(result.stdout) or _ANY_IPV4_RE.search(result.stdout)
+        else:
+            # Linux approach; macOS has no `ip`, which raises FileNotFoundError
+            result = subprocess.run(['ip', 'route'], capture_output=True, text=True, check=True)
+            match = _ROUTE_SRC_RE.search(result.stdout)
+        return match.group(1) if match else None
+    
+    def resolve(self, hostname, port=5000):
+        """Resolve a hostname to its addresses, IPv4 first, reusing recent answers"""
+        addresses = self._dns_cache.get(hostname)
+        if addresses is None:
+            addresses = []
+            for family, _, _, _, sockaddr in socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM):
+                ip = sockaddr[0]
+                if family == socket.AF_INET6 and sockaddr[3]:
+                    # Link-local addresses are only reachable through their interface
+                    ip = f"{ip}%{sockaddr[3]}"
+                if ip not in addresses:
+                    addresses.append(ip)
+            addresses.sort(key=lambda ip: ':' in ip)
+            self._dns_cache.set(hostname, addresses)
+        return addresses
+    
+    def find_server(self, hostname, port=5000):
+        """Return (address, username) for the first resolved address of hostname running the camera server"""
+        for ip in self.resolve(hostname, port):
+            username = self.probe_username(ip, port)
+            if username is not None:
+                return ip, username
+        return None
+    
+    def probe_username(self, ip, port=5000):
+        """Return the username reported by the camera server at ip, or None if nothing answers"""
+        cached = self._username_cache.get((ip, port))
+        if cached is not None:
+            # '' records an address that recently didn't answer
+            return cached or None
+        
+        username = None
         try:
-            # On Windows, ethernet interfaces often start with 'Ethernet' or have specific names
-            if platform.system() == "Windows":
-                # Try to get ethernet interface IP
-                result = subprocess.run(['ipconfig'], capture_output=True, text=True)
-                lines = result.stdout.split('\n')
-                for i, line in enumerate(lines):
-                    if 'Ethernet adapter' in line and '192.168.2.' in line:
-                        # Look for IPv4 address in next few lines
-                        for j in range(i+1, min(i+10, len(lines))):
-                            if 'IPv4' in lines[j] and '192.168.2.' in lines[j]:
-                                ip = lines[j].split(':')[-1].strip()
-                                return ip
-            else:
-                # Linux/macOS approach
-                result = subprocess.run(['ip', 'route'], capture_output=True, text=True)
-                for line in result.stdout.split('\n'):
-                    if '192.168.2.' in line:
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            return parts[2]  # src IP
+            # A JSON /username reply proves the camera server is up, so one request does both jobs
+            url = f"http://{_url_host(ip)}:{port}/username"
+            data = _get_small_json(self.session, url, (self.connect_timeout, self.username_timeout))
+            if isinstance(data, dict):
+                username = data.get('username', 'unknown')
         except:
             pass
-        return None
+        self._username_cache.set((ip, port), username or '')
+        return username
+    
+    @staticmethod
+    def _pi_entry(ip, username):
+        return {
+            'name': f'Pi-{username}',
+            'host': f'http://{_url_host(ip)}:5000',
+            'username': username,
+            'discovered': True,
+            'output_dir': f'/home/{username}/captures'
+        }
+    
+    def _report(self, progress_callback, message):
+        # Probes run on worker threads, so serialize calls into the caller's callback
+        if progress_callback:
+            with self._progress_lock:
+                progress_callback(message)
     
-    def check_pi_server(self, ip, port=5000):
-        """Check if an IP is running the Pi camera server"""
+    def _find_open_ports(self, ips, port=5000):
+        """Return the IPs accepting connections on port, using one non-blocking connect sweep"""
+        pending_codes = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+        # Closing with a zero linger sends RST, so probe sockets leave no TIME_WAIT behind on either end
+        no_linger = struct.pack('ii', 1, 0)
+        socks = []
+        open_ips = set()
+        selector = selectors.DefaultSelector()
         try:
-            url = f"http://{ip}:{port}/status"
-            response = requests.get(url, timeout=2)
-            if response.status_code == 200:
-                return True
+            for ip in ips:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                socks.append(sock)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, no_linger)
+                sock.setblocking(False)
+                result = sock.connect_ex((ip, port))
+                if result in pending_codes:
+                    selector.register(sock, selectors.EVENT_WRITE, ip)
+                elif result == 0:
+                    open_ips.add(ip)
+            
+            # A socket becomes writable once its connect finishes; SO_ERROR says whether it succeeded
+            deadline = time.monotonic() + self.connect_timeout
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        open_ips.add(key.data)
+                    selector.unregister(key.fileobj)
+        finally:
+            selector.close()
+            for sock in socks:
+                sock.close()
+        return open_ips
+    
+    def _probe(self, target, progress_callback=None):
+        """Probe one hostname or IP and return a Pi entry if the camera server answers"""
+        self._report(progress_callback, f"Checking {target}...")
+        try:
+            if target.endswith('.local'):
+                # Resolve once (cached) and probe the IPs so requests doesn't re-resolve per connection
+                found = self.find_server(target)
+                if found is None:
+                    return None
+                ip, username = found
+                label = f"{target} ({ip})"
+            else:
+                ip, label = target, target
+                username = self.probe_username(ip)
+                if username is None:
+                    return None
+            self._report(progress_callback, f"Found Pi at {label} (user: {username})")
+            return self._pi_entry(ip, username)
         except:
             pass
-        return False
+        return None
     
-    def scan_direct_ethernet(self, progress_callback=None):
-        """Scan for Pis connected via direct ethernet (192.168.2.x range)"""
-        self.found_pis = []
+    def _unique(self, results, known_hosts):
+        """Drop empty results, Pis already in known_hosts and repeats of the same host"""
+        found = {}
+        for pi in results:
+            # A hostname and its IP can both answer for the same Pi
+            if pi and pi['host'] not in found and urlsplit(pi['host']).hostname not in known_hosts:
+                found[pi['host']] = pi
+        return list(found.values())
+    
+    def _probe_all(self, targets, progress_callback=None):
+        """Probe targets concurrently; the whole batch costs about one probe's worth of timeouts"""
+        pool = ThreadPoolExecutor(max_workers=max(len(targets), 1))
+        try:
+            futures = [pool.submit(self._probe, target, progress_callback) for target in targets]
+            return _gather(futures, self.connect_timeout + self.username_timeout + 0.5)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def browse_mdns(self, progress_callback=None, wait=1.5):
+        """Find camera servers advertised over mDNS; returns [] if zeroconf is unavailable"""
+        if Zeroconf is None:
+            return []
         
+        self._report(progress_callback, "Browsing mDNS for camera servers...")
+        names = []
+        
+        def on_service_state_change(zeroconf, service_type, name, state_change):
+            if state_change is ServiceStateChange.Added:
+                names.append(name)
+        
+        found = []
+        zc = Zeroconf()
+        try:
+            ServiceBrowser(zc, '_http._tcp.local.', handlers=[on_service_state_change])
+            time.sleep(wait)
+            for name in list(names):
+                info = zc.get_service_info('_http._tcp.local.', name, timeout=500)
+                if info is None or info.port != 5000:
+                    continue
+                for ip in info.parsed_addresses():
+                    username = self.probe_username(ip) if '.' in ip else None
+                    if username is not None:
+                        self._report(progress_callback, f"Found Pi at {ip} via mDNS (user: {username})")
+                        found.append(self._pi_entry(ip, username))
+                        break
+        except Exception as e:
+            self._report(progress_callback, f"mDNS browse failed: {e}")
+        finally:
+            zc.close()
+        return found
+    
+    def scan_direct_ethernet(self, progress_callback=None, known_hosts=frozenset(), skip=()):
+        """Scan for Pis connected via direct ethernet (192.168.2.x range), skipping known_hosts and skip"""
         # Based on README, Pis use 192.168.2.11, 192.168.2.12, etc.
         # Scan a reasonable range: 192.168.2.11 to 192.168.2.20
         base_ip = "192.168.2"
         
-        if progress_callback:
-            progress_callback("Scanning direct ethernet connections (192.168.2.x)...")
+        self._report(progress_callback, "Scanning direct ethernet connections (192.168.2.x)...")
         
-        # Try common Pi hostnames first (fast)
+        # Common Pi hostnames are listed first so they win over the same Pi found by IP
         pi_hostnames = [
             "xxlab1.local",  # Based on README naming convention
             "xxlab2.local",
             "raspberrypi.local",
             "pi.local"
         ]
-        
-        for hostname in pi_hostnames:
+        # Already-configured Pis need no round-trip
+        excluded = set(known_hosts) | set(skip)
+        pi_hostnames = [hostname for hostname in pi_hostnames if hostname not in excluded]
+        ips = [f"{base_ip}.{i}" for i in range(11, 21) if f"{base_ip}.{i}" not in excluded]
+        if ips:
             try:
-                if progress_callback:
-                    progress_callback(f"Trying hostname: {hostname}")
-                ip = socket.gethostbyname(hostname)
-                if self.check_pi_server(ip):
-                    self.found_pis.append({
-                        'name': f'Pi-{hostname}',
-                        'host': f'http://{ip}:5000',
-                        'discovered': True
-                    })
-                    if progress_callback:
-                        progress_callback(f"Found Pi at {hostname} ({ip})")
-            except:
-                pass
+                interface = self.get_ethernet_interface()
+            except Exception:
+                # Detection couldn't run (e.g. no `ip` on macOS), so sweep the range as before
+                interface = ''
+            if interface is None:
+                # Without an address on the direct-link subnet those IPs can't be reached; only names can
+                self._report(progress_callback, "No direct-ethernet interface detected - skipping IP scan")
+                ips = []
         
-        # Scan specific IP range (192.168.2.11 to 192.168.2.20)
-        for i in range(11, 21):
-            ip = f"{base_ip}.{i}"
-            if progress_callback:
-                progress_callback(f"Scanning {ip}...")
+        # Every probe is I/O bound, so run them all at once; total time is ~one timeout
+        pool = ThreadPoolExecutor(max_workers=max(len(pi_hostnames) + len(ips), 1))
+        try:
+            hostname_futures = [pool.submit(self._probe, hostname, progress_callback) for hostname in pi_hostnames]
             
-            # Quick port check first
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                result = sock.connect_ex((ip, 5000))
-                sock.close()
-                
-                if result == 0:  # Port is open
-                    if self.check_pi_server(ip):
-                        self.found_pis.append({
-                            'name': f'Pi-{ip}',
-                            'host': f'http://{ip}:5000',
-                            'discovered': True
-                        })
-                        if progress_callback:
-                            progress_callback(f"Found Pi at {ip}")
-            except:
-                pass
+            # Scan specific IP range with a single connect sweep, then HTTP-check only open ports
+            if ips:
+                self._report(progress_callback, f"Scanning {ips[0]} - {ips[-1]}...")
+            open_ips = self._find_open_ports(ips) if ips else set()
+            ip_futures = [pool.submit(self._probe, ip, progress_callback) for ip in ips if ip in open_ips]
+            
+            # A slow .local lookup must not hold the scan past one probe's worth of timeouts
+            results = _gather(hostname_futures + ip_futures, self.connect_timeout + self.username_timeout + 0.5)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
         
+        self.found_pis = self._unique(results, known_hosts)
         return self.found_pis
     
-    def scan_network(self, progress_callback=None):
-        """Main scanning method - optimized for direct ethernet connections"""
-        return self.scan_direct_ethernet(progress_callback)
+    def scan_network(self, progress_callback=None, known_hosts=frozenset(), recent=()):
+        """Find camera servers not in known_hosts: recently seen addresses, then mDNS, then direct ethernet"""
+        # Addresses that answered recently are the likely Pis, so try them before anything slower
+        recent = [addr for addr in recent if addr not in known_hosts]
+        if recent:
+            self._report(progress_callback, "Checking recently seen Pis...")
+            self.found_pis = self._unique(self._probe_all(recent, progress_callback), known_hosts)
+            if self.found_pis:
+                return self.found_pis
+        
+        # One multicast browse finds every advertising Pi at once; probe only if it finds none
+        self.found_pis = self._unique(self.browse_mdns(progress_callback), known_hosts)
+        if self.found_pis:
+            return self.found_pis
+        
+        return self.scan_direct_ethernet(progress_callback, known_hosts, skip=recent)
+
+class PollScheduler:
+    """Pick the next status-poll delay from recently observed round-trip times"""
+    BASE_MS = 1000
+    MAX_MS = 25000
+    
+    def __init__(self):
+        self.rtts = deque(maxlen=3)
+    
+    def observe(self, rtt):
+        self.rtts.append(rtt)
+    
+    def next_ms(self):
+        if not self.rtts:
+            return self.BASE_MS
+        mean = sum(self.rtts) / len(self.rtts)
+        if mean < 0.5:
+            multiplier = 1
+        elif mean < 1.5:
+            multiplier = 4
+        else:
+            multiplier = 10
+        return min(self.BASE_MS * multiplier, self.MAX_MS)
+
+class StatusStream:
+    """One open /status/stream connection; close() makes its reader thread exit promptly"""
+    
+    def __init__(self):
+        self.session = requests.Session()
+        self.response = None
+        self.stopped = threading.Event()
+    
+    def close(self):
+        self.stopped.set()
+        resp = self.response
+        if resp is not None:
+            # Closing the response alone leaves the reader blocked in recv until the Pi sends again
+            sock = getattr(getattr(resp.raw, '_connection', None), 'sock', None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            resp.close()
+        self.session.close()
 
 class PiTab:
+    # (label, variable attribute, pi_data key, default, width, widget) for each parameter row
+    CONTROL_SPEC = [
+        [('Duration (s):', 'duration_var', 'duration', '300', 8, ttk.Entry),
+         ('FPS:', 'fps_var', 'fps', '100', 8, ttk.Entry),
+         ('Subject:', 'subject_var', 'subject', 'default', 12, ttk.Entry)],
+        [('Width:', 'width_var', 'width', '640', 8, ttk.Entry),
+         ('Height:', 'height_var', 'height', '480', 8, ttk.Entry)],
+        [('Cam0:', 'cam0_var', 'cam0', '/dev/video0', 12, ttk.Combobox),
+         ('Cam1:', 'cam1_var', 'cam1', '/dev/video2', 12, ttk.Combobox)],
+    ]
+    
     def __init__(self, parent, pi_data, pi_index, gui_instance):
         self.parent = parent
         self.pi_data = pi_data
         self.pi_index = pi_index
         self.gui = gui_instance
         self.frame = ttk.Frame(parent)
+        self.built = False
+        # Widgets are created the first time the tab is shown; until then it holds a placeholder
+        self._placeholder = ttk.Label(self.frame, text="Loading...")
+        self._placeholder.pack(expand=True)
+    
+    def build(self):
+        """Create the tab's widgets if they don't exist yet"""
+        if self.built:
+            return
+        self.built = True
+        self._placeholder.destroy()
         self.setup_tab()
     
     def setup_tab(self):
@@ -164,68 +555,40 @@ class PiTab:
     
     def setup_controls(self, parent):
         # Pi info header
-        info_frame = ttk.LabelFrame(parent, text=f"Pi: {self.pi_data.get('name', self.pi_data.get('username', 'Unknown'))}")
-        info_frame.pack(fill='x', pady=(0, 10))
+        self.info_frame = ttk.LabelFrame(parent)
+        self.info_frame.pack(fill='x', pady=(0, 10))
         
-        ttk.Label(info_frame, text=f"Host: {self.pi_data['host']}").pack(anchor='w', padx=5, pady=2)
-        ttk.Label(info_frame, text=f"User: {self.pi_data.get('username', 'unknown')}").pack(anchor='w', padx=5, pady=2)
+        self.host_label = ttk.Label(self.info_frame)
+        self.host_label.pack(anchor='w', padx=5, pady=2)
+        self.user_label = ttk.Label(self.info_frame)
+        self.user_label.pack(anchor='w', padx=5, pady=2)
+        self.update_info()
         
         # Recording parameters
         param_frame = ttk.LabelFrame(parent, text="Recording Parameters")
         param_frame.pack(fill='x', pady=(0, 10))
         
-        # Row 1: Duration, FPS, Subject
-        row1 = ttk.Frame(param_frame)
-        row1.pack(fill='x', padx=5, pady=5)
-        
-        ttk.Label(row1, text='Duration (s):').grid(row=0, column=0, sticky='w')
-        self.duration_var = tk.StringVar(value=self.pi_data.get('duration', '300'))
-        ttk.Entry(row1, textvariable=self.duration_var, width=8).grid(row=0, column=1, sticky='w', padx=(5, 15))
-        
-        ttk.Label(row1, text='FPS:').grid(row=0, column=2, sticky='w')
-        self.fps_var = tk.StringVar(value=self.pi_data.get('fps', '100'))
-        ttk.Entry(row1, textvariable=self.fps_var, width=8).grid(row=0, column=3, sticky='w', padx=(5, 15))
-        
-        ttk.Label(row1, text='Subject:').grid(row=0, column=4, sticky='w')
-        self.subject_var = tk.StringVar(value=self.pi_data.get('subject', 'default'))
-        ttk.Entry(row1, textvariable=self.subject_var, width=12).grid(row=0, column=5, sticky='w', padx=5)
-        
-        # Row 2: Width, Height
-        row2 = ttk.Frame(param_frame)
-        row2.pack(fill='x', padx=5, pady=5)
-        
-        ttk.Label(row2, text='Width:').grid(row=0, column=0, sticky='w')
-        self.width_var = tk.StringVar(value=self.pi_data.get('width', '640'))
-        ttk.Entry(row2, textvariable=self.width_var, width=8).grid(row=0, column=1, sticky='w', padx=(5, 15))
-        
-        ttk.Label(row2, text='Height:').grid(row=0, column=2, sticky='w')
-        self.height_var = tk.StringVar(value=self.pi_data.get('height', '480'))
-        ttk.Entry(row2, textvariable=self.height_var, width=8).grid(row=0, column=3, sticky='w', padx=(5, 15))
-        
-        # Row 3: Camera devices
-        row3 = ttk.Frame(param_frame)
-        row3.pack(fill='x', padx=5, pady=5)
-        
-        ttk.Label(row3, text='Cam0:').grid(row=0, column=0, sticky='w')
-        self.cam0_var = tk.StringVar(value=self.pi_data.get('cam0', '/dev/video0'))
-        self.cam0_combo = ttk.Combobox(row3, textvariable=self.cam0_var, width=12)
-        self.cam0_combo.grid(row=0, column=1, sticky='w', padx=(5, 15))
-        
-        ttk.Label(row3, text='Cam1:').grid(row=0, column=2, sticky='w')
-        self.cam1_var = tk.StringVar(value=self.pi_data.get('cam1', '/dev/video2'))
-        self.cam1_combo = ttk.Combobox(row3, textvariable=self.cam1_var, width=12)
-        self.cam1_combo.grid(row=0, column=3, sticky='w', padx=5)
+        # Rows 1-3: Duration/FPS/Subject, Width/Height, camera devices
+        for spec_row in self.CONTROL_SPEC:
+            row = ttk.Frame(param_frame)
+            row.pack(fill='x', padx=5, pady=5)
+            for col, (label, attr, key, default, width, widget) in enumerate(spec_row):
+                ttk.Label(row, text=label).grid(row=0, column=col * 2, sticky='w')
+                var = tk.StringVar(value=self.pi_data.get(key, default))
+                setattr(self, attr, var)
+                field = widget(row, textvariable=var, width=width)
+                padx = 5 if col == len(spec_row) - 1 else (5, 15)
+                field.grid(row=0, column=col * 2 + 1, sticky='w', padx=padx)
+                if widget is ttk.Combobox:
+                    # Detect Cameras fills these in later
+                    setattr(self, f'{key}_combo', field)
         
         # Row 4: Output directory
         row4 = ttk.Frame(param_frame)
         row4.pack(fill='x', padx=5, pady=5)
         
         ttk.Label(row4, text='Output Dir:').grid(row=0, column=0, sticky='w')
-        default_output = self.pi_data.get('output_dir')
-        if not default_output:
-            username = self.pi_data.get('username', 'pi')
-            default_output = f'/home/{username}/captures'
-        self.output_dir_var = tk.StringVar(value=default_output)
+        self.output_dir_var = tk.StringVar(value=self._stored_output_dir())
         ttk.Entry(row4, textvariable=self.output_dir_var, width=30).grid(row=0, column=1, columnspan=3, sticky='w', padx=5)
         
         # Control buttons
@@ -236,9 +599,15 @@ class PiTab:
         btn_row1 = ttk.Frame(button_frame)
         btn_row1.pack(fill='x', padx=5, pady=5)
         
-        ttk.Button(btn_row1, text='Start Recording', command=self.start_recording).grid(row=0, column=0, padx=2)
-        ttk.Button(btn_row1, text='Stop Recording', command=self.stop_recording).grid(row=0, column=1, padx=2)
-        ttk.Button(btn_row1, text='Check Status', command=self.check_status).grid(row=0, column=2, padx=2)
+        # Request buttons are kept so they can be disabled while their request is in flight
+        self.buttons = {
+            'start': ttk.Button(btn_row1, text='Start Recording', command=self.start_recording),
+            'stop': ttk.Button(btn_row1, text='Stop Recording', command=self.stop_recording),
+            'status': ttk.Button(btn_row1, text='Check Status', command=self.check_status)
+        }
+        self.buttons['start'].grid(row=0, column=0, padx=2)
+        self.buttons['stop'].grid(row=0, column=1, padx=2)
+        self.buttons['status'].grid(row=0, column=2, padx=2)
         ttk.Button(btn_row1, text='Take Snapshot', command=self.take_snapshot).grid(row=0, column=3, padx=2)
         
         # Second row of buttons
@@ -249,6 +618,18 @@ class PiTab:
         ttk.Button(btn_row2, text='Save Config', command=self.save_config).grid(row=0, column=1, padx=2)
         ttk.Button(btn_row2, text='Edit Pi', command=self.edit_pi).grid(row=0, column=2, padx=2)
         ttk.Button(btn_row2, text='Remove Pi', command=self.remove_pi).grid(row=0, column=3, padx=2)
+        
+        # Third row: live status monitor
+        btn_row3 = ttk.Frame(button_frame)
+        btn_row3.pack(fill='x', padx=5, pady=5)
+        
+        self.monitor_var = tk.BooleanVar(value=False)
+        self.monitor_scheduler = None
+        self.monitor_stream = None
+        ttk.Checkbutton(btn_row3, text='Monitor Status', variable=self.monitor_var,
+                        command=self.toggle_monitor).grid(row=0, column=0, padx=2)
+        self.status_label = ttk.Label(btn_row3, text='Status: unknown')
+        self.status_label.grid(row=0, column=1, sticky='w', padx=10)
     
     def setup_snapshots(self, parent):
         snapshot_frame = ttk.LabelFrame(parent, text="Camera Snapshots")
@@ -265,9 +646,27 @@ class PiTab:
         self.pi_data['cam0_label'] = self.cam0_label
         self.pi_data['cam1_label'] = self.cam1_label
     
+    def update_info(self):
+        """Refresh the header labels after the Pi's name, host or username changed"""
+        self.info_frame.config(text=f"Pi: {self.pi_data.get('name', self.pi_data.get('username', 'Unknown'))}")
+        self.host_label.config(text=f"Host: {self.pi_data['host']}")
+        self.user_label.config(text=f"User: {self.pi_data.get('username', 'unknown')}")
+    
+    def _stored_output_dir(self):
+        return self.pi_data.get('output_dir') or f"/home/{self.pi_data.get('username', 'pi')}/captures"
+    
+    def params(self):
+        """Recording parameters as strings: from the widgets once built, else from the stored config"""
+        if self.built:
+            values = {key: getattr(self, attr).get() for row in self.CONTROL_SPEC for _, attr, key, *_ in row}
+            values['output_dir'] = self.output_dir_var.get()
+        else:
+            values = {key: self.pi_data.get(key, default) for row in self.CONTROL_SPEC for _, _, key, default, *_ in row}
+            values['output_dir'] = self._stored_output_dir()
+        return values
+    
     def start_recording(self):
-        self.gui.start_recording(self.pi_index, self.duration_var, self.fps_var, self.subject_var, 
-                               self.width_var, self.height_var, self.cam0_var, self.cam1_var, self.output_dir_var)
+        self.gui.start_recording(self.pi_index, self.params())
     
     def stop_recording(self):
         self.gui.stop_recording(self.pi_index)
@@ -275,6 +674,9 @@ class PiTab:
     def check_status(self):
         self.gui.check_status(self.pi_index)
     
+    def toggle_monitor(self):
+        self.gui.toggle_monitor(self.pi_index)
+    
     def take_snapshot(self):
         self.gui.take_snapshot(self.pi_index)
     
@@ -298,17 +700,70 @@ class PiControllerGUI:
         self.root.geometry("1200x800")  # Larger default window
         self.pis = PI_CONFIG.copy()
         self.tabs = {}
+        # Tabs keyed by each Pi's stable uid so refresh_gui only touches what changed
+        self._tabs_by_uid = {}
+        self._welcome_frame = None
         self.notebook = None
-        self.scanner = NetworkScanner()
+        # Discovery requests go to arbitrary addresses, so they share one larger pool
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+        self.scanner = NetworkScanner(self.session)
+        # One shared pool for every short background job instead of a new thread per action
+        self.io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='io')
+        self.status_poller = MultiStatusPoller()
+        # Only successful lookups are cached, so a Pi that was still booting is retried
+        self._username_cache = TTLCache(ttl=60)
+        self._cameras_cache = TTLCache(ttl=10)
+        self.scan_cache = _load_scan_cache()
+        # Contents of scan_cache.json as last read or written, so closing only rewrites it if it changed
+        self._saved_scan_cache = dict(self.scan_cache)
+        self._closed = False
+        # (file key, parsed Pi list) for the config last read or written
+        self._config_cache = None
+        self._save_after_id = None
         self.setup_menu()
         self.setup_notebook()
         self.refresh_gui()
+        self.root.protocol('WM_DELETE_WINDOW', self._on_close)
+        self.io_pool.submit(prewarm_sessions, list(self.pis))
+
+    def _on_close(self):
+        """Drop pending requests and close pooled connections before exiting"""
+        # Workers still running from here on must not schedule callbacks on the destroyed root
+        self._closed = True
+        try:
+            if self._save_after_id is not None:
+                # A debounced save hasn't run yet; write it now rather than lose it
+                self.root.after_cancel(self._save_after_id)
+                self._save_after_id = None
+                _write_config_files(self._clean_config(), dict(self.scan_cache))
+            elif self.scan_cache != self._saved_scan_cache:
+                # Addresses found by a scan since the last save
+                _write_config_atomic(_dump_config(self.scan_cache), SCAN_CACHE_FILE)
+        except Exception as e:
+            print(f"Failed to save config on exit: {e}")
+        for tab in self._tabs_by_uid.values():
+            if getattr(tab, 'monitor_stream', None) is not None:
+                tab.monitor_stream.close()
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        self.status_poller.close()
+        close_sessions()
+        self.session.close()
+        self.root.destroy()
 
     def setup_menu(self):
         menubar = tk.Menu(self.root)
         pi_menu = tk.Menu(menubar, tearoff=0)
         pi_menu.add_command(label='Add Pi', command=self.add_pi)
         pi_menu.add_command(label='Quick Scan', command=self.quick_scan)
+        pi_menu.add_command(label='Scan Timeouts...', command=self.set_scan_timeouts)
+        pi_menu.add_separator()
+        pi_menu.add_command(label='Start All Recording', command=self.start_all_recording)
+        pi_menu.add_command(label='Stop All Recording', command=self.stop_all_recording)
+        pi_menu.add_command(label='Check All Status', command=self.check_all_status)
         pi_menu.add_separator()
         pi_menu.add_command(label='Save All Config', command=self.save_config)
         pi_menu.add_command(label='Load Config', command=self.load_config)
@@ -318,104 +773,268 @@ class PiControllerGUI:
     def setup_notebook(self):
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_selected)
 
-    def check_pi_server(self, ip, port=5000):
-        """Check if an IP is running the Pi camera server"""
+    def _on_tab_selected(self, event):
+        """Build a Pi tab's widgets the first time it is selected"""
+        selected = self.notebook.select()
+        for tab in self.tabs.values():
+            if str(tab.frame) == selected:
+                tab.build()
+                break
+
+    def set_scan_timeouts(self):
+        """Let users on slower networks raise the discovery timeouts"""
+        connect_ms = simpledialog.askinteger('Scan Timeouts', 'Connect timeout (ms):',
+                                             initialvalue=int(self.scanner.connect_timeout * 1000), minvalue=50)
+        if connect_ms is None:
+            return
+        username_ms = simpledialog.askinteger('Scan Timeouts', 'Username response timeout (ms):',
+                                              initialvalue=int(self.scanner.username_timeout * 1000), minvalue=50)
+        if username_ms is None:
+            return
+        self.scanner.connect_timeout = connect_ms / 1000
+        self.scanner.username_timeout = username_ms / 1000
+
+    def _submit(self, fn, on_done, *args, button=None):
+        """Run fn on the worker pool and hand the finished future to on_done on the Tk thread"""
+        # A given button stays disabled until the request finishes so repeated clicks can't queue duplicates
+        if button is not None:
+            button.state(['disabled'])
+        
+        def deliver(future):
+            # The button's tab may have been removed while the request was in flight
+            if button is not None and button.winfo_exists():
+                button.state(['!disabled'])
+            on_done(future)
+        
+        future = self.io_pool.submit(fn, *args)
+        future.add_done_callback(lambda f: self._call_in_tk(deliver, f))
+        return future
+
+    def _call_in_tk(self, fn, *args):
+        """Schedule fn on the Tk thread from a worker; dropped once the window has closed"""
+        if self._closed:
+            return
         try:
-            url = f"http://{ip}:{port}/status"
-            response = requests.get(url, timeout=2)
-            if response.status_code == 200:
-                return True
-        except:
+            self.root.after(0, fn, *args)
+        except (RuntimeError, tk.TclError):
+            # The window was destroyed between the check and the call
             pass
-        return False
+
+    def _tab_button(self, idx, name):
+        tab = self.tabs.get(idx)
+        return tab.buttons[name] if tab and tab.built else None
+
+    def _show_result(self, title, future, format_result=str):
+        """Report the outcome of a background Pi request in a message box"""
+        try:
+            messagebox.showinfo(title, format_result(future.result()))
+        except Exception as e:
+            messagebox.showerror(title, str(e))
+
+    def toggle_monitor(self, idx):
+        """Follow a Pi's status while its monitor box is ticked"""
+        tab = self.tabs.get(idx)
+        if not tab:
+            return
+        if not tab.monitor_var.get():
+            if tab.monitor_stream is not None:
+                tab.monitor_stream.close()
+                tab.monitor_stream = None
+            return
+        if tab.monitor_stream is None and tab.monitor_scheduler is None:
+            self._open_status_stream(tab)
+
+    def _monitoring(self, tab):
+        return tab.monitor_var.get() and self.tabs.get(tab.pi_index) is tab
+
+    def _open_status_stream(self, tab):
+        """Open one persistent status connection for the tab on its own session"""
+        stream = StatusStream()
+        tab.monitor_stream = stream
+        # The stream blocks for as long as monitoring is on, so it gets its own thread rather than io_pool
+        thread = threading.Thread(target=self._read_status_stream, args=(tab, stream))
+        thread.daemon = True
+        thread.start()
+
+    def _read_status_stream(self, tab, stream):
+        """Relay server-sent status events to the tab until the stream closes"""
+        try:
+            # The server sends a keepalive comment well inside the read timeout
+            with stream.session.get(tab.pi_data['_status_stream_url'], stream=True,
+                                    timeout=(CONNECT_TIMEOUT, 30)) as resp:
+                # Set before checking stopped, so a close() racing with the connect is never missed
+                stream.response = resp
+                if stream.stopped.is_set():
+                    return
+                if resp.status_code == 404:
+                    # Older Pi servers have no stream, so keep polling them instead
+                    self._call_in_tk(self._fall_back_to_polling, tab, stream)
+                    return
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if stream.stopped.is_set():
+                        break
+                    if line.startswith(b'data:'):
+                        status = loads_json(line[5:])
+                        text = 'recording' if status.get('recording') else 'idle'
+                        self._call_in_tk(self._apply_status, tab, text)
+        except Exception:
+            pass
+        if not stream.stopped.is_set():
+            self._call_in_tk(self._on_stream_closed, tab, stream)
+
+    def _apply_status(self, tab, text):
+        if self._monitoring(tab):
+            tab.status_label.config(text=f"Status: {text}")
+
+    def _on_stream_closed(self, tab, stream):
+        """Reconnect after a dropped stream unless monitoring was switched off meanwhile"""
+        if tab.monitor_stream is not stream:
+            return
+        stream.close()
+        tab.monitor_stream = None
+        if self._monitoring(tab):
+            tab.status_label.config(text="Status: unreachable")
+            self.root.after(PollScheduler.BASE_MS * 2, self._reopen_status_stream, tab)
+
+    def _reopen_status_stream(self, tab):
+        if self._monitoring(tab) and tab.monitor_stream is None and tab.monitor_scheduler is None:
+            self._open_status_stream(tab)
+
+    def _fall_back_to_polling(self, tab, stream):
+        if tab.monitor_stream is not stream:
+            return
+        stream.close()
+        tab.monitor_stream = None
+        tab.monitor_scheduler = PollScheduler()
+        self._poll_status(tab)
+
+    def _poll_status(self, tab):
+        """Poll one Pi's status and reschedule based on the observed round-trip time"""
+        if not self._monitoring(tab):
+            tab.monitor_scheduler = None
+            return
+        
+        pi = tab.pi_data
+        scheduler = tab.monitor_scheduler
+        
+        def poll():
+            started = time.monotonic()
+            try:
+                return self._get_status(pi)
+            finally:
+                # Failures count too, so an unreachable Pi is polled less often
+                scheduler.observe(time.monotonic() - started)
+        
+        def on_done(future):
+            try:
+                text = 'recording' if future.result().get('recording') else 'idle'
+            except Exception:
+                text = 'unreachable'
+            if self._monitoring(tab):
+                tab.status_label.config(text=f"Status: {text}")
+            self.root.after(scheduler.next_ms(), self._poll_status, tab)
+        
+        self._submit(poll, on_done)
 
     def get_pi_username(self, host):
         """Get the username from a Pi"""
+        cached = self._username_cache.get(host)
+        if cached is not None:
+            return cached
         try:
             url = f"{host}/username"
-            response = requests.get(url, timeout=2)
-            if response.status_code == 200:
-                return response.json().get('username', 'unknown')
+            data = _get_small_json(self.session, url, (CONNECT_TIMEOUT, 2))
+            if data is not None:
+                username = data.get('username', 'unknown')
+                self._username_cache.set(host, username)
+                return username
         except:
             pass
         return 'unknown'
 
     def get_pi_cameras(self, host):
         """Get available cameras from a Pi"""
+        cached = self._cameras_cache.get(host)
+        if cached is not None:
+            return cached
         try:
             url = f"{host}/cameras"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                return response.json().get('cameras', [])
+            data = _get_small_json(self.session, url, (CONNECT_TIMEOUT, 5))
+            if data is not None:
+                cameras = data.get('cameras', [])
+                self._cameras_cache.set(host, cameras)
+                return cameras
         except:
             pass
         return []
 
     def quick_scan(self):
         """Simple scan for common Pi addresses"""
-        def scan_thread():
-            # Create progress window
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Quick Pi Scan")
-            progress_window.geometry("300x150")
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            
-            progress_label = ttk.Label(progress_window, text="Checking common Pi addresses...")
-            progress_label.pack(pady=10)
-            
-            progress_text = tk.Text(progress_window, height=6, width=40)
-            progress_text.pack(pady=10, padx=10)
-            
-            def update_progress(message):
-                progress_text.insert('end', message + '\n')
-                progress_text.see('end')
-                progress_window.update()
-            
-            found_pis = []
-            
-            # Common Pi addresses to try
-            addresses_to_try = [
-                "192.168.2.11",
-                "192.168.2.12", 
-                "192.168.2.13",
-                "192.168.2.14",
-                "192.168.2.15",
-                "raspberrypi.local",
-                "xxlab1.local",
-                "xxlab2.local"
-            ]
-            
-            for addr in addresses_to_try:
-                update_progress(f"Checking {addr}...")
-                
+        # Create progress window
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Quick Pi Scan")
+        progress_window.geometry("300x150")
+        progress_window.transient(self.root)
+        progress_window.grab_set()
+        
+        progress_label = ttk.Label(progress_window, text="Checking common Pi addresses...")
+        progress_label.pack(pady=10)
+        
+        progress_text = tk.Text(progress_window, height=6, width=40)
+        progress_text.pack(pady=10, padx=10)
+        
+        progress_queue = queue.Queue()
+        
+        def drain_progress():
+            # Probes run on worker threads; the Tk thread flushes their lines in one insert per tick
+            if not progress_window.winfo_exists():
+                return
+            lines = []
+            while True:
                 try:
-                    if self.check_pi_server(addr):
-                        host = f"http://{addr}:5000"
-                        username = self.get_pi_username(host)
-                        found_pis.append({
-                            'name': f'Pi-{username}',
-                            'host': host,
-                            'username': username,
-                            'discovered': True,
-                            'output_dir': f'/home/{username}/captures'
-                        })
-                        update_progress(f"Found Pi at {addr} (user: {username})")
-                except:
-                    pass
-            
+                    lines.append(progress_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if lines:
+                progress_text.insert('end', '\n'.join(lines) + '\n')
+                progress_text.see('end')
+            progress_window.after(50, drain_progress)
+        
+        def update_progress(message):
+            progress_queue.put(message)
+        
+        drain_progress()
+        
+        # Pis already in the list would only be filtered out later by add_selected
+        known_hosts = {urlsplit(pi['host']).hostname for pi in self.pis}
+        cutoff = time.time() - SCAN_CACHE_TTL
+        recently_live = [addr for addr, last_seen in self.scan_cache.items() if last_seen > cutoff]
+        
+        def finish(found_pis):
             progress_window.destroy()
             
+            now = time.time()
+            for pi in found_pis:
+                self.scan_cache[urlsplit(pi['host']).hostname] = now
+            
             if found_pis:
                 self.show_discovered_pis(found_pis)
             else:
                 messagebox.showinfo("Scan Complete", "No Raspberry Pis found. Try adding them manually.")
         
-        # Run scan in separate thread
-        thread = threading.Thread(target=scan_thread)
-        thread.daemon = True
-        thread.start()
+        def scan_thread():
+            try:
+                found_pis = self.scanner.scan_network(update_progress, known_hosts, recently_live)
+            except Exception as e:
+                update_progress(f"Scan failed: {e}")
+                found_pis = []
+            self._call_in_tk(finish, found_pis)
+        
+        # Run scan in the background
+        self.io_pool.submit(scan_thread)
 
     def show_discovered_pis(self, found_pis):
         """Show dialog to select which discovered Pis to add"""
@@ -436,12 +1055,13 @@ class PiControllerGUI:
         
         def add_selected():
             added_count = 0
+            existing_hosts = {p['host'] for p in self.pis}
             for i, var in enumerate(pi_vars):
                 if var.get():
                     # Check if Pi already exists
-                    pi_exists = any(p['host'] == found_pis[i]['host'] for p in self.pis)
-                    if not pi_exists:
+                    if found_pis[i]['host'] not in existing_hosts:
                         self.pis.append(found_pis[i])
+                        existing_hosts.add(found_pis[i]['host'])
                         added_count += 1
             
             if added_count > 0:
@@ -459,9 +1079,9 @@ class PiControllerGUI:
         """Detect available cameras on a specific Pi"""
         pi = self.pis[idx]
         
-        def detect_thread():
+        def on_done(future):
             try:
-                cameras = self.get_pi_cameras(pi['host'])
+                cameras = future.result()
                 
                 if cameras:
                     self.show_camera_selection(idx, cameras)
@@ -471,9 +1091,7 @@ class PiControllerGUI:
             except Exception as e:
                 messagebox.showerror("Camera Detection Error", f"Failed to detect cameras: {str(e)}")
         
-        thread = threading.Thread(target=detect_thread)
-        thread.daemon = True
-        thread.start()
+        self._submit(self.get_pi_cameras, on_done, pi['host'])
 
     def show_camera_selection(self, idx, cameras):
         """Show dialog to select cameras for cam0 and cam1"""
@@ -520,7 +1138,12 @@ class PiControllerGUI:
         def apply_selection():
             pi['cam0'] = cam0_var.get()
             pi['cam1'] = cam1_var.get()
-            self.refresh_gui()
+            precompute_urls(pi)
+            # The tab is kept across refreshes, so its fields have to be updated directly
+            tab = self.tabs.get(idx)
+            if tab and tab.built:
+                tab.cam0_var.set(pi['cam0'])
+                tab.cam1_var.set(pi['cam1'])
             dialog.destroy()
             messagebox.showinfo("Camera Selection", f"Cameras updated for {pi.get('name', 'Pi')}")
         
@@ -528,66 +1151,97 @@ class PiControllerGUI:
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=5)
 
     def refresh_gui(self):
-        # Clear existing tabs
-        for tab_id in self.notebook.tabs():
-            self.notebook.forget(tab_id)
-        self.tabs.clear()
+        for pi in self.pis:
+            if '_uid' not in pi:
+                pi['_uid'] = uuid.uuid4().hex
         
-        # Create tabs for each Pi
+        # Drop tabs whose Pi has been removed
+        current_uids = {pi['_uid'] for pi in self.pis}
+        for uid in list(self._tabs_by_uid):
+            if uid not in current_uids:
+                tab = self._tabs_by_uid.pop(uid)
+                if getattr(tab, 'monitor_stream', None) is not None:
+                    tab.monitor_stream.close()
+                self.notebook.forget(tab.frame)
+                tab.frame.destroy()
+        
+        # Create tabs only for new Pis; existing ones just get their index refreshed
+        self.tabs.clear()
         for idx, pi in enumerate(self.pis):
-            tab = PiTab(self.notebook, pi, idx, self)
             tab_name = pi.get('name', pi.get('username', f'Pi-{idx}'))
-            self.notebook.add(tab.frame, text=tab_name)
+            tab = self._tabs_by_uid.get(pi['_uid'])
+            if tab is None:
+                precompute_urls(pi)
+                tab = PiTab(self.notebook, pi, idx, self)
+                self.notebook.add(tab.frame, text=tab_name)
+                self._tabs_by_uid[pi['_uid']] = tab
+            else:
+                tab.pi_index = idx
+                self.notebook.tab(tab.frame, text=tab_name)
             self.tabs[idx] = tab
         
         # If no Pis, show a welcome tab
-        if not self.pis:
-            welcome_frame = ttk.Frame(self.notebook)
-            welcome_label = ttk.Label(welcome_frame, text="No Raspberry Pis configured.\nUse 'Pis' menu to add or scan for Pis.", 
+        if not self.pis and self._welcome_frame is None:
+            self._welcome_frame = ttk.Frame(self.notebook)
+            welcome_label = ttk.Label(self._welcome_frame, text="No Raspberry Pis configured.\nUse 'Pis' menu to add or scan for Pis.", 
                                     font=('Arial', 14), justify='center')
             welcome_label.pack(expand=True, fill='both', padx=50, pady=50)
-            self.notebook.add(welcome_frame, text="Welcome")
+            self.notebook.add(self._welcome_frame, text="Welcome")
+        elif self.pis and self._welcome_frame is not None:
+            self.notebook.forget(self._welcome_frame)
+            self._welcome_frame.destroy()
+            self._welcome_frame = None
+
+    def _fetch_snapshot(self, pi, url):
+        """Download and decode one camera snapshot to a preview-sized PIL image, or None"""
+        # PIL is imported on first snapshot; many sessions never take one
+        from PIL import Image
+        if url is None:
+            return None
+        with session_for(pi).get(url, timeout=(CONNECT_TIMEOUT, 5), stream=True) as resp:
+            if resp.status_code != 200:
+                return None
+            resp.raw.decode_content = True
+            image = Image.open(resp.raw)
+            # Let libjpeg decode at reduced scale instead of full resolution
+            image.draft('RGB', (320, 240))
+            image.load()
+        image.thumbnail((320, 240), Image.BILINEAR)  # Larger thumbnails
+        return image
+
+    def _set_label_image(self, label, image, error_text):
+        """Show a fetched snapshot in its label (runs on the Tk thread)"""
+        if image is None:
+            label.config(text=error_text)
+            return
+        from PIL import ImageTk
+        # PhotoImage creates a Tk image, so it must be built here rather than on the worker
+        photo = ImageTk.PhotoImage(image)
+        label.config(image=photo, text="")
+        label.image = photo
 
     def take_snapshot(self, idx):
         """Take snapshots from both cameras and display them"""
         pi = self.pis[idx]
+        errors = []
         
-        def snapshot_thread():
+        def show(label, error_text, future):
+            if not label.winfo_exists():
+                return
             try:
-                # Take snapshot from camera 0
-                cam0_device = pi.get('cam0', '/dev/video0')
-                url_cam0 = f"{pi['host']}/snapshot/{cam0_device.replace('/dev/video', '')}"
-                resp_cam0 = requests.get(url_cam0, timeout=5)
-                if resp_cam0.status_code == 200:
-                    img_data = resp_cam0.content
-                    image = Image.open(io.BytesIO(img_data))
-                    image.thumbnail((320, 240))  # Larger thumbnails
-                    photo = ImageTk.PhotoImage(image)
-                    pi['cam0_label'].config(image=photo, text="")
-                    pi['cam0_label'].image = photo
-                else:
-                    pi['cam0_label'].config(text=f"Cam0: Error")
-                
-                # Take snapshot from camera 1
-                cam1_device = pi.get('cam1', '/dev/video2')
-                url_cam1 = f"{pi['host']}/snapshot/{cam1_device.replace('/dev/video', '')}"
-                resp_cam1 = requests.get(url_cam1, timeout=5)
-                if resp_cam1.status_code == 200:
-                    img_data = resp_cam1.content
-                    image = Image.open(io.BytesIO(img_data))
-                    image.thumbnail((320, 240))  # Larger thumbnails
-                    photo = ImageTk.PhotoImage(image)
-                    pi['cam1_label'].config(image=photo, text="")
-                    pi['cam1_label'].image = photo
-                else:
-                    pi['cam1_label'].config(text=f"Cam1: Error")
-                    
+                self._set_label_image(label, future.result(), error_text)
             except Exception as e:
-                messagebox.showerror("Snapshot Error", f"Failed to take snapshots: {str(e)}")
+                label.config(text=error_text)
+                # Both cameras usually fail together; one dialog is enough
+                if not errors:
+                    errors.append(e)
+                    messagebox.showerror("Snapshot Error", f"Failed to take snapshots: {str(e)}")
         
-        thread = threading.Thread(target=snapshot_thread)
-        thread.daemon = True
-        thread.start()
+        # Both cameras are on the same Pi, so fetch them side by side; each label updates as its image lands
+        self._submit(self._fetch_snapshot, lambda future: show(pi['cam0_label'], "Cam0: Error", future),
+                     pi, pi['_cam0_snapshot_url'])
+        self._submit(self._fetch_snapshot, lambda future: show(pi['cam1_label'], "Cam1: Error", future),
+                     pi, pi['_cam1_snapshot_url'])
 
     def save_pi_config(self, idx, duration_var, fps_var, subject_var, width_var, height_var, cam0_var, cam1_var, output_dir_var):
         """Save configuration for a specific Pi"""
@@ -602,8 +1256,8 @@ class PiControllerGUI:
             'cam1': cam1_var.get(),
             'output_dir': output_dir_var.get()
         })
-        self.save_config()
-        messagebox.showinfo("Save Config", f"Configuration saved for {pi.get('name', 'Pi')}")
+        precompute_urls(pi)
+        self.save_config(f"Configuration saved for {pi.get('name', 'Pi')}")
 
     def add_pi(self):
         name = simpledialog.askstring('Add Pi', 'Enter Pi name:')
@@ -631,98 +1285,253 @@ class PiControllerGUI:
         name = simpledialog.askstring('Edit Pi', 'Edit Pi name:', initialvalue=pi.get('name', ''))
         host = simpledialog.askstring('Edit Pi', 'Edit Pi host:', initialvalue=pi['host'])
         if name and host:
+            if host != pi['host']:
+                # Cached lookups describe the old address
+                self._username_cache.invalidate(pi['host'])
+                self._cameras_cache.invalidate(pi['host'])
             pi['name'] = name
             pi['host'] = host
             # Update username and output directory
             username = self.get_pi_username(host)
             pi['username'] = username
             # Update output directory if it's still using the old default
+            tab = self.tabs[idx]
             if pi.get('output_dir') == '/home/pi/captures' or not pi.get('output_dir'):
                 pi['output_dir'] = f'/home/{username}/captures'
-            self.refresh_gui()
+                if tab.built:
+                    tab.output_dir_var.set(pi['output_dir'])
+            # Update the existing tab in place instead of rebuilding every tab
+            precompute_urls(pi)
+            if tab.built:
+                tab.update_info()
+            self.notebook.tab(tab.frame, text=name)
 
     def remove_pi(self, idx):
         if messagebox.askyesno('Remove Pi', f"Remove {self.pis[idx].get('name', 'Pi')}?"):
             self.pis.pop(idx)
             self.refresh_gui()
 
-    def save_config(self):
+    def save_config(self, message='Configuration saved.'):
+        # Saves in quick succession (e.g. several tabs' Save buttons) are coalesced into one write
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(500, self._flush_config, message)
+
+    def _clean_config(self):
         # Create a clean copy of pis data without Tkinter widgets
         clean_pis = []
         for pi in self.pis:
             clean_pi = {}
             for key, value in pi.items():
-                # Skip Tkinter widgets and other non-serializable objects
-                if not key.startswith('cam') or not key.endswith('_label'):
-                    clean_pi[key] = value
+                # Skip Tkinter widgets, cached URLs and other non-serializable objects
+                if key.startswith('_') or (key.startswith('cam') and key.endswith('_label')):
+                    continue
+                clean_pi[key] = value
             clean_pis.append(clean_pi)
+        return clean_pis
+
+    def _flush_config(self, message):
+        """Write the pending config save on the worker pool"""
+        self._save_after_id = None
+        clean_pis = self._clean_config()
+        
+        def on_done(future):
+            try:
+                # Cache state is only ever touched on the Tk thread
+                self._config_cache = (future.result(), clean_pis)
+                self._saved_scan_cache = scan_cache
+                messagebox.showinfo('Save Config', message)
+            except Exception as e:
+                # Also covers a TypeError from a value that can't be serialized
+                messagebox.showerror('Save Config', f'Error saving config: {e}')
         
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(clean_pis, f, indent=2)
-        messagebox.showinfo('Save Config', 'Configuration saved.')
+        scan_cache = dict(self.scan_cache)
+        
+        # Encoding and the fsync happen on the worker pool so the window stays responsive
+        self._submit(_write_config_files, on_done, clean_pis, scan_cache)
 
     def load_config(self):
         if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    self.pis = json.load(f)
-                self.refresh_gui()
-                messagebox.showinfo('Load Config', 'Configuration loaded.')
-            except (json.JSONDecodeError, ValueError) as e:
-                messagebox.showerror('Load Config', f'Error loading config: {e}')
+            def on_done(future):
+                try:
+                    self._config_cache, self.pis = future.result()
+                    self.refresh_gui()
+                    messagebox.showinfo('Load Config', 'Configuration loaded.')
+                except (OSError, ValueError) as e:
+                    messagebox.showerror('Load Config', f'Error loading config: {e}')
+            
+            self._submit(self._read_config_cached, on_done)
         else:
             messagebox.showerror('Load Config', 'No config file found.')
 
-    def start_recording(self, idx, duration_var, fps_var, subject_var, width_var, height_var, cam0_var, cam1_var, output_dir_var):
-        pi = self.pis[idx]
+    def _read_config_cached(self):
+        """Return (cache entry, Pi list), reusing the last parse while the file is unchanged"""
+        # Runs on the worker pool, so the caller stores the entry back on the Tk thread
+        key = _config_key()
+        cached = self._config_cache
+        if cached is None or cached[0] != key:
+            cached = (key, _read_config())
+        # The GUI mutates Pi dicts in place, so never hand out the cached ones
+        return cached, copy.deepcopy(cached[1])
+
+    def _build_start_payload(self, params):
+        """Validate recording parameters (as returned by PiTab.params) and build the start_recording payload"""
         try:
-            duration = int(duration_var.get())
-            fps = int(fps_var.get())
-            width = int(width_var.get())
-            height = int(height_var.get())
+            duration = int(params['duration'])
+            fps = int(params['fps'])
+            width = int(params['width'])
+            height = int(params['height'])
         except ValueError:
             messagebox.showerror('Input Error', 'Duration, FPS, width, and height must be integers.')
-            return
+            return None
         
-        url = f"{pi['host']}/start_recording"
-        payload = {
+        return {
             'duration': duration,
             'fps': fps,
-            'subject': subject_var.get(),
+            'subject': params['subject'],
             'width': width,
             'height': height,
-            'cam0': cam0_var.get(),
-            'cam1': cam1_var.get(),
-            'output_dir': output_dir_var.get()
+            'cam0': params['cam0'],
+            'cam1': params['cam1'],
+            'output_dir': params['output_dir']
         }
+
+    def _post_start(self, pi, payload):
+        url = pi['_start_url']
+        resp = request_with_backoff(session_for(pi), 'POST', url, data=encode_json(payload), headers=JSON_HEADERS,
+                                     timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        resp.raise_for_status()
+        return parse_json(resp)
+
+    def start_recording(self, idx, params):
+        pi = self.pis[idx]
+        payload = self._build_start_payload(params)
+        if payload is None:
+            return
         
-        try:
-            resp = requests.post(url, json=payload, timeout=5)
-            resp.raise_for_status()
-            result = resp.json()
-            messagebox.showinfo('Start Recording', f"{result.get('status', 'Started')}\nFolder: {result.get('folder', 'Unknown')}")
-        except Exception as e:
-            messagebox.showerror('Start Recording', str(e))
+        def on_done(future):
+            self._show_result('Start Recording', future,
+                              lambda result: f"{result.get('status', 'Started')}\nFolder: {result.get('folder', 'Unknown')}")
+        
+        self._submit(self._post_start, on_done, pi, payload, button=self._tab_button(idx, 'start'))
+
+    def start_all_recording(self):
+        """Start recording on every Pi concurrently, using each tab's parameters"""
+        jobs = []
+        for idx, tab in self.tabs.items():
+            # Tabs that were never opened use the Pi's stored config rather than being built here
+            payload = self._build_start_payload(tab.params())
+            if payload is None:
+                return
+            jobs.append((self.pis[idx], payload))
+        
+        if not jobs:
+            messagebox.showinfo('Start All Recording', 'No Raspberry Pis configured.')
+            return
+        
+        # Connect to every Pi first, then release all POSTs together to minimise start skew
+        barrier = threading.Barrier(len(jobs))
+        
+        def start_one(pi, payload):
+            try:
+                prewarm(pi)
+            except Exception:
+                # Release the other workers instead of leaving them waiting for this Pi
+                barrier.abort()
+                raise
+            try:
+                # A Pi whose prewarm stalls can't hold the others for more than one request's worth of time
+                barrier.wait(timeout=CONNECT_TIMEOUT + READ_TIMEOUT)
+            except threading.BrokenBarrierError:
+                # Another Pi failed or stalled; start this one without waiting any longer
+                pass
+            return self._post_start(pi, payload)
+        
+        self._run_on_all('Start All Recording', start_one,
+                         lambda result: f"{result.get('status', 'Started')} ({result.get('folder', 'Unknown')})",
+                         jobs)
+
+    def _post_stop(self, pi):
+        url = pi['_stop_url']
+        resp = request_with_backoff(session_for(pi), 'POST', url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        resp.raise_for_status()
+        return parse_json(resp)
+
+    def _get_status(self, pi):
+        url = pi['_status_url']
+        resp = request_with_backoff(session_for(pi), 'GET', url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        resp.raise_for_status()
+        return parse_json(resp)
 
     def stop_recording(self, idx):
         pi = self.pis[idx]
-        url = f"{pi['host']}/stop_recording"
-        try:
-            resp = requests.post(url, timeout=5)
-            resp.raise_for_status()
-            messagebox.showinfo('Stop Recording', f"{resp.json()}")
-        except Exception as e:
-            messagebox.showerror('Stop Recording', str(e))
+        self._submit(self._post_stop, lambda future: self._show_result('Stop Recording', future), pi,
+                     button=self._tab_button(idx, 'stop'))
 
     def check_status(self, idx):
         pi = self.pis[idx]
-        url = f"{pi['host']}/status"
-        try:
-            resp = requests.get(url, timeout=5)
-            resp.raise_for_status()
-            messagebox.showinfo('Status', f"{resp.json()}")
-        except Exception as e:
-            messagebox.showerror('Status', str(e))
+        self._submit(self._get_status, lambda future: self._show_result('Status', future), pi,
+                     button=self._tab_button(idx, 'status'))
+
+    def _run_on_all(self, title, fn, format_result, jobs=None):
+        """Call fn(pi, *args) for every (pi, *args) job concurrently and report all outcomes in one message box"""
+        if jobs is None:
+            jobs = [(pi,) for pi in self.pis]
+        if not jobs:
+            messagebox.showinfo(title, 'No Raspberry Pis configured.')
+            return
+        
+        def run_all_thread():
+            # One worker per Pi, so a dead host only ever costs its own timeout
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                futures = [pool.submit(fn, *job) for job in jobs]
+            
+            outcomes = []
+            for job, future in zip(jobs, futures):
+                name = job[0].get('name', job[0]['host'])
+                try:
+                    outcomes.append((name, format_result(future.result()), True))
+                except Exception as e:
+                    outcomes.append((name, str(e), False))
+            self._call_in_tk(self._show_summary, title, outcomes)
+        
+        # The fan-out itself uses a pool sized to the job count so start's barrier can always fill
+        self.io_pool.submit(run_all_thread)
+
+    def _show_summary(self, title, outcomes):
+        """Report (name, text, ok) outcomes for several Pis in one message box"""
+        failed = sum(1 for _, _, ok in outcomes if not ok)
+        lines = [f"{len(outcomes) - failed} of {len(outcomes)} succeeded\n"]
+        lines.extend(f"{name}: {text}" for name, text, _ in outcomes)
+        show = messagebox.showwarning if failed else messagebox.showinfo
+        show(title, '\n'.join(lines))
+
+    def stop_all_recording(self):
+        """Stop recording on every Pi concurrently"""
+        self._run_on_all('Stop All Recording', self._post_stop,
+                         lambda result: result.get('status', 'Stopped'))
+
+    def check_all_status(self):
+        """Query every Pi's status from a single thread with the multiplexed poller"""
+        pis = list(self.pis)
+        if not pis:
+            messagebox.showinfo('Status', 'No Raspberry Pis configured.')
+            return
+        
+        def on_done(future):
+            results = future.result()
+            outcomes = []
+            for pi in pis:
+                status = results[pi['host']]
+                name = pi.get('name', pi['host'])
+                if status is None:
+                    outcomes.append((name, 'no response (offline or timed out)', False))
+                else:
+                    outcomes.append((name, 'Recording' if status.get('recording') else 'Idle', True))
+            self._show_summary('Status', outcomes)
+        
+        # Connects to every Pi start together, so unreachable ones cost one timeout in total
+        self._submit(self.status_poller.poll, on_done, pis)
 
 if __name__ == '__main__':
     root = tk.Tk()
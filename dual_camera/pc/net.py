@@ -0,0 +1,236 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import json
+import os
+import re
+import socket
+import selectors
+import errno
+import threading
+import time
+import random
+import http.client
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Offline Pis should fail fast on connect; a reachable Pi gets longer to answer
+CONNECT_TIMEOUT, READ_TIMEOUT = 1.0, 5.0
+
+# A camera device as stored in the config: /dev/videoN, or just N
+_DEVICE_RE = re.compile(r'^(?:/dev/video)?(\d+)$')
+
+def snapshot_url(host, device):
+    """Snapshot URL for a camera device, or None if the device name isn't a video index"""
+    match = _DEVICE_RE.match(device)
+    return f"{host}/snapshot/{match.group(1)}" if match else None
+
+def precompute_urls(pi):
+    """Cache the endpoint URLs for a Pi so request paths skip per-call formatting"""
+    host = pi['host']
+    pi['_start_url'] = host + '/start_recording'
+    pi['_stop_url'] = host + '/stop_recording'
+    pi['_status_url'] = host + '/status'
+    pi['_status_stream_url'] = host + '/status/stream'
+    pi['_cam0_snapshot_url'] = snapshot_url(host, pi.get('cam0', '/dev/video0'))
+    pi['_cam1_snapshot_url'] = snapshot_url(host, pi.get('cam1', '/dev/video2'))
+
+# One session per Pi host so each Pi keeps its own kept-alive connection pool
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+def session_for(pi):
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(pi['host'])
+        if session is None:
+            session = requests.Session()
+            # Two snapshot fetches plus a status check and a username or camera probe can overlap on one Pi
+            session.mount(pi['host'], HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+            _SESSIONS[pi['host']] = session
+        return session
+
+def close_sessions():
+    """Close every pooled Pi session so sockets are shut down cleanly on exit"""
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+# Methods that are safe to resend even if the Pi may already have acted on the first attempt
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+def _never_sent(exc):
+    """True if a ConnectionError happened while connecting, before any request bytes left the PC"""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+# Kept to 3 attempts with a 0.5 s cap: with the 1 s connect timeout an offline Pi fails in about 3 s.
+# The original 5 attempts / 1 s cap took about 6 s, which defeats failing fast on dead hosts
+def request_with_backoff(session, method, url, max_attempts=3, base=0.1, cap=0.5, **kwargs):
+    """Send a request, retrying transient connection failures with jittered exponential backoff"""
+    for attempt in range(max_attempts):
+        try:
+            return session.request(method, url, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            # A POST that may have reached the Pi is not resent, or a start could run twice
+            if attempt == max_attempts - 1 or (method.upper() not in IDEMPOTENT_METHODS and not _never_sent(e)):
+                raise
+            time.sleep(min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+def encode_json(payload):
+    """Serialize a request body once so it can be sent to several Pis without re-encoding"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+def loads_json(data):
+    """Decode JSON bytes, using orjson when it is available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def parse_json(resp):
+    """Decode a JSON response body, using orjson when it is available"""
+    return loads_json(resp.content)
+
+def prewarm(pi):
+    """Open a pooled connection to a Pi so the next command skips the TCP handshake"""
+    try:
+        session_for(pi).get(pi['_status_url'], timeout=(CONNECT_TIMEOUT, 2))
+    except requests.exceptions.RequestException:
+        pass
+
+def prewarm_sessions(pis):
+    for pi in pis:
+        prewarm(pi)
+
+class MultiStatusPoller:
+    """Poll /status on many Pis from a single thread by multiplexing their sockets"""
+    
+    def __init__(self, pis=(), timeout=READ_TIMEOUT):
+        self.pis = pis
+        self.timeout = timeout
+        self.conns = {}
+        self._addrs = {}
+        # The GUI can start a second poll before the first finishes; both would share these connections
+        self._lock = threading.Lock()
+    
+    def _connection(self, pi):
+        conn = self.conns.get(pi['host'])
+        if conn is None:
+            parts = urlsplit(pi['host'])
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+            self.conns[pi['host']] = conn
+        return conn
+    
+    def _connect(self, sel, pi, conn, retried):
+        """Start a non-blocking connect; the socket waits for EVENT_WRITE until it completes"""
+        conn.close()
+        key = (conn.host, conn.port)
+        addr = self._addrs.get(key)
+        if addr is None:
+            family, _, _, _, sockaddr = socket.getaddrinfo(conn.host, conn.port, type=socket.SOCK_STREAM)[0]
+            addr = self._addrs[key] = (family, sockaddr)
+        sock = socket.socket(addr[0], socket.SOCK_STREAM)
+        sock.setblocking(False)
+        result = sock.connect_ex(addr[1])
+        if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            sock.close()
+            raise OSError(result, os.strerror(result))
+        conn.sock = sock
+        sel.register(sock, selectors.EVENT_WRITE, (pi, conn, retried, time.monotonic() + CONNECT_TIMEOUT))
+    
+    def _send(self, sel, pi, conn, retried, deadline):
+        """Send the request on an open connection, reconnecting once if a kept-alive socket has gone stale"""
+        try:
+            conn.request('GET', '/status')
+        except OSError:
+            if retried:
+                raise
+            self._connect(sel, pi, conn, True)
+            return
+        sel.register(conn.sock, selectors.EVENT_READ, (pi, conn, retried, deadline))
+    
+    def poll(self, pis=None):
+        """Return {host: status or None} once every Pi has answered or timed out"""
+        if pis is None:
+            pis = self.pis
+        with self._lock:
+            return self._poll(pis)
+    
+    def _poll(self, pis):
+        results = {pi['host']: None for pi in pis}
+        # Drop connections to Pis that are no longer in the list
+        for host in [host for host in self.conns if host not in results]:
+            self.conns.pop(host).close()
+        
+        sel = selectors.DefaultSelector()
+        deadline = time.monotonic() + self.timeout
+        try:
+            # Every connect and send starts before any wait, so unreachable Pis time out together.
+            # Pis listed twice under one host share a connection, so each host is polled once
+            for pi in {pi['host']: pi for pi in pis}.values():
+                conn = self._connection(pi)
+                try:
+                    if conn.sock is None:
+                        self._connect(sel, pi, conn, True)
+                    else:
+                        self._send(sel, pi, conn, False, deadline)
+                except OSError:
+                    conn.close()
+            
+            while sel.get_map():
+                now = time.monotonic()
+                # Connects and responses that ran out of time are given up on
+                for key in list(sel.get_map().values()):
+                    if key.data[3] <= now:
+                        sel.unregister(key.fileobj)
+                        key.data[1].close()
+                if not sel.get_map():
+                    break
+                next_deadline = min(key.data[3] for key in sel.get_map().values())
+                for key, events in sel.select(max(next_deadline - now, 0)):
+                    pi, conn, retried, _ = key.data
+                    sel.unregister(key.fileobj)
+                    try:
+                        if events & selectors.EVENT_WRITE:
+                            # A socket becomes writable once its connect finishes; SO_ERROR says whether it succeeded
+                            error = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                            if error:
+                                raise OSError(error, os.strerror(error))
+                            conn.sock.settimeout(self.timeout)
+                            self._send(sel, pi, conn, True, deadline)
+                            continue
+                        resp = conn.getresponse()
+                        body = resp.read()
+                        results[pi['host']] = loads_json(body) if resp.status == 200 else None
+                    except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+                        # A kept-alive socket the Pi already closed; try once more on a fresh one
+                        conn.close()
+                        if not retried:
+                            try:
+                                self._connect(sel, pi, conn, True)
+                            except OSError:
+                                conn.close()
+                    except (OSError, http.client.HTTPException, ValueError):
+                        conn.close()
+        finally:
+            # Only reached with sockets still registered if the loop was interrupted
+            for key in list(sel.get_map().values()):
+                key.data[1].close()
+            sel.close()
+        return results
+    
+    def close(self):
+        with self._lock:
+            for conn in self.conns.values():
+                conn.close()
+            self.conns.clear()
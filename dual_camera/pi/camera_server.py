@@ -1,6 +1,12 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 import subprocess
+import socket
+import signal
+import sys
+import atexit
 import threading
+import json
+import time
 import os
 import cv2
 import tempfile
@@ -153,5 +159,69 @@ def status():
     is_recording = recording_process is not None and recording_process.poll() is None
     return jsonify({'recording': is_recording}), 200
 
+@app.route('/status/stream', methods=['GET'])
+def status_stream():
+    """Push the recording state as server-sent events whenever it changes"""
+    def events():
+        last_state = None
+        last_sent = 0
+        while True:
+            process = recording_process
+            is_recording = process is not None and process.poll() is None
+            now = time.monotonic()
+            if is_recording != last_state:
+                last_state = is_recording
+                last_sent = now
+                yield f"data: {json.dumps({'recording': is_recording})}\n\n"
+            elif now - last_sent >= 15:
+                # Comment line keeps idle connections from hitting the client's read timeout
+                last_sent = now
+                yield ": keepalive\n\n"
+            time.sleep(0.5)
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+def advertise_service(port=5000):
+    """Advertise the server over mDNS so the PC controller can find it without scanning"""
+    try:
+        import ifaddr
+        from zeroconf import Zeroconf, ServiceInfo
+    except ImportError:
+        return None
+    
+    try:
+        # Every non-loopback IPv4 address, so the PC finds the Pi over ethernet or Wi-Fi
+        addresses = [ip.ip for adapter in ifaddr.get_adapters() for ip in adapter.ips
+                     if ip.is_IPv4 and not ip.ip.startswith('127.')]
+        if not addresses:
+            print("mDNS advertisement skipped: no network address")
+            return None
+        hostname = socket.gethostname()
+        info = ServiceInfo(
+            '_http._tcp.local.',
+            f'dual-camera-{hostname}._http._tcp.local.',
+            addresses=[socket.inet_aton(ip) for ip in addresses],
+            port=port,
+            properties={'app': 'dual_camera'},
+            server=f'{hostname}.local.',
+        )
+        zc = Zeroconf()
+        zc.register_service(info)
+    except Exception as e:
+        print(f"mDNS advertisement failed: {e}")
+        return None
+    
+    def stop_advertising():
+        # Tells PCs the service is gone instead of leaving a stale record until its TTL expires
+        zc.unregister_service(info)
+        zc.close()
+    
+    atexit.register(stop_advertising)
+    print(f"Advertising camera server on {', '.join(addresses)}:{port} via mDNS")
+    return zc
+
 if __name__ == '__main__':
+    # Exit normally on SIGTERM (e.g. systemd stop) so atexit handlers still run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    advertise_service(5000)
     app.run(host='0.0.0.0', port=5000)